@@ -11,25 +11,86 @@
 ## 3. Restart your terminal
 ## 4. pip3 install google-api-python-client
 ## 5. pip3 install oauth2client
+## 6. (Optional) pip3 install orjson for faster JSON parsing
 ## You will also need to modify config.json to match your spreadsheet and you
 ## will need to obtain a Google Sheets API token which should be saved as
 ## token.json
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
 from decimal import Decimal
+from functools import lru_cache
 from httplib2 import Http
+from itertools import takewhile
+from operator import itemgetter
+import csv
 import json
 import os
+import re
 import sys
 
 from googleapiclient.discovery import build
 from oauth2client import file, client, tools
 
+try:
+  import orjson
+except ImportError:
+  orjson = None  # Optional -- fall back to the json module
+
 
 CONFIG_FILENAME = 'config.json'  # Should be in same directory as this file
 CLASSIFICATIONS_FILENAME = 'classifications.json'  # Should be in same directory as this file
 SCOPES = 'https://www.googleapis.com/auth/spreadsheets'  # If modifying these scopes, delete the file token.json
 RANGE_TO_CHECK = timedelta(days=7 * 4)  # 4 weeks
+CHASE_CSV_HEADER = 'Transaction Date,Post Date,Description,Category,Type,Amount,Memo'
+CHASE_ENTRY_TYPES = frozenset(['Sale', 'Return', 'Fee'])  # Chase CSV entry types we log
+IGNORED_CHASE_ENTRY_TYPES = frozenset([
+  'Type',  # 'Type' is the first line header
+  'Payment',  # 'Payment' is a confirmation of our credit card payment
+  'Adjustment',  # 'Adjustment' is cash back -- not currently logging, but could in the future
+])
+MAX_ROWS_PER_BATCH_UPDATE = 100  # Rows added per Sheets batchUpdate call
+WHITESPACE_RE = re.compile(r'\s+')
+EXTRA_WHITESPACE_RE = re.compile(r'^\s|\s$|\s\s|[^\S ]')  # Leading/trailing, consecutive, or non-space whitespace
+AMOUNT_FORMATTING_TABLE = str.maketrans('', '', '$,')  # Strips currency formatting from spreadsheet amounts
+PREFIX_TRIE_TERMINAL = None  # Key marking the end of a prefix in Classifications.prefix_trie -- never a character
+
+
+# Cell formats shared by every added row. googleapiclient only serializes
+# these, so reusing the same dicts is safe as long as nothing mutates them
+TEXT_FORMAT = {
+  'fontFamily': 'Arial',
+  'fontSize': 10,
+}
+NEW_TEXT_FORMAT = {
+  'fontFamily': 'Arial',
+  'fontSize': 10,
+  'bold': True,  # Bold to make it clear what is "new"
+}
+DATE_CELL_FORMAT = {
+  'numberFormat': {
+    'pattern': 'mmmm d, yyy',
+    'type': 'DATE',
+  },
+  'textFormat': TEXT_FORMAT,
+}
+CURRENCY_CELL_FORMAT = {
+  'numberFormat': {
+    'pattern': '$0.00',
+    'type': 'CURRENCY',
+  },
+  'textFormat': TEXT_FORMAT,
+}
+NEW_TEXT_CELL_FORMAT = {
+  'textFormat': NEW_TEXT_FORMAT,
+}
+
+
+def load_json_file(filename):
+  with open(filename, 'rb') as file_handle:
+    if orjson:
+      return orjson.loads(file_handle.read())
+    return json.load(file_handle)
 
 
 class ConfigData:
@@ -37,7 +98,7 @@ class ConfigData:
   def parse():
     current_path = os.path.dirname(__file__)
     config_filename = os.path.join(current_path, CONFIG_FILENAME)
-    parsed_json = json.load(open(config_filename))
+    parsed_json = load_json_file(config_filename)
 
     return_value = ConfigData()
     return_value.spreadsheet_id = parsed_json.pop('spreadsheet_id')
@@ -56,6 +117,14 @@ class ClassificationType:
   PREFIX = 'prefix'
 
 
+def normalize_string(s):
+  # Skip building new strings when s is already normalized. The isascii()
+  # check matters: islower() doesn't guarantee lower() is a no-op outside ASCII
+  if s.isascii() and s.islower() and s == s.strip():
+    return s
+  return s.lower().strip()
+
+
 class Classification:
   @staticmethod
   def parse_single(json_entry):
@@ -84,6 +153,7 @@ class Classification:
     return_value = Classification()
     return_value.type = classification_type
     return_value.match = classification_match
+    return_value.normalized_match = normalize_string(classification_match)
     return_value.category = classification_category
     return_value.subcategory = classification_subcategory
     return_value.quarter = classification_quarter
@@ -91,38 +161,79 @@ class Classification:
     return return_value
 
   @staticmethod
+  @lru_cache(maxsize=None)  # classifications.json doesn't change while we run
   def parse():
     current_path = os.path.dirname(__file__)
     classifications_filename = os.path.join(current_path, CLASSIFICATIONS_FILENAME)
-    parsed_json = json.load(open(classifications_filename))
+    parsed_json = load_json_file(classifications_filename)
 
-    return_value = []
+    classifications = []
     for json_entry in parsed_json:
       classification = Classification.parse_single(json_entry)
       if classification:
-        return_value.append(classification)
+        classifications.append(classification)
 
-    return return_value
+    return Classifications(classifications)
 
   @staticmethod
   def find(classifications, description):
-    def normalize_string(s):
-      return s.lower().strip()
+    # Recurring merchants show up with the same description over and over, so
+    # remember the result (including None) for each description
+    if description not in classifications.found_by_description:
+      classifications.found_by_description[description] = Classification.find_uncached(classifications, description)
+    return classifications.found_by_description[description]
 
+  @staticmethod
+  def find_uncached(classifications, description):
     normalized_description = normalize_string(description)
 
-    full_match_classifications = [classification for classification in classifications if classification.type == ClassificationType.FULL]
-    prefix_classifications = [classification for classification in classifications if classification.type == ClassificationType.PREFIX]
+    classification = classifications.full_match_classifications.get(normalized_description)
+    if classification:
+      return classification
+
+    # Walk the description through the prefix trie. Every terminal passed along
+    # the way is a matching prefix; like the old linear scan, the one earliest
+    # in classifications.json wins
+    node = classifications.prefix_trie
+    best_match = node.get(PREFIX_TRIE_TERMINAL)
+    for character in normalized_description:
+      node = node.get(character)
+      if node is None:
+        break
+      match = node.get(PREFIX_TRIE_TERMINAL)
+      if match and (best_match is None or match[0] < best_match[0]):
+        best_match = match
+
+    if best_match:
+      return best_match[1]
 
-    for classification in full_match_classifications:
-      if normalized_description == normalize_string(classification.match):
-        return classification
+    return None
 
-    for classification in prefix_classifications:
-      if normalized_description.startswith(normalize_string(classification.match)):
-        return classification
 
-    return None
+class Classifications:
+  # Classifications indexed by type once at parse time, so that finding the
+  # classification for each transaction doesn't have to scan the whole list
+  def __init__(self, classifications):
+    # Keyed by normalized match; the earliest entry in classifications.json wins
+    self.full_match_classifications = {}
+    for classification in classifications:
+      if classification.type == ClassificationType.FULL:
+        self.full_match_classifications.setdefault(classification.normalized_match, classification)
+
+    prefix_classifications = [classification for classification in classifications if classification.type == ClassificationType.PREFIX]
+
+    # Nested dicts keyed by character, so a description can be matched against
+    # every prefix in a single walk. A node that ends a prefix holds
+    # (position in classifications.json, classification) under
+    # PREFIX_TRIE_TERMINAL
+    self.prefix_trie = {}
+    for index, classification in enumerate(prefix_classifications):
+      node = self.prefix_trie
+      for character in classification.normalized_match:
+        node = node.setdefault(character, {})
+      node.setdefault(PREFIX_TRIE_TERMINAL, (index, classification))  # Keep the earliest duplicate
+
+    self.found_by_description = {}  # Filled in by Classification.find
 
 
 def get_sheets_service():
@@ -157,29 +268,31 @@ def datetime_to_sheets_days(dt):
   """
   Convert datetime object to sheets days format
   """
-  # convert date objects to datetimes so that we can get sub-date time values
+  # Google sheets uses days since December 30, 1899 as its number format
   # datetime.datetime is a subclass of datetime.date, so we have to check
   # isinstance in the proper order to differentiate
-  desired_date = None
   if isinstance(dt, datetime):
-    desired_date = dt
-  elif isinstance(dt, date):
-    desired_date = datetime(dt.year, dt.month, dt.day)
-  assert isinstance(desired_date, datetime)
-
-  SECONDS_PER_DAY = 60 * 60 * 24
-  # Google sheets uses days since December 30, 1899 as its number format
-  SHEETS_START_DAY = datetime(1899, 12, 30)
-
-  delta = desired_date - SHEETS_START_DAY
-  days = delta.total_seconds() / SECONDS_PER_DAY
-  return days
+    # Keep sub-date time values as a fraction of a day
+    return (dt - datetime(1899, 12, 30)) / timedelta(days=1)
+  assert isinstance(dt, date)
+  # Plain dates are whole days, so the serial number is an integer
+  return (dt - date(1899, 12, 30)).days
 
 
 def get_chase_csv_filename_or_abort(config_data):
   downloads_directory = os.path.expanduser(config_data.local_directory)
-  filenames = os.listdir(os.path.expanduser(config_data.local_directory))
-  filenames = [filename for filename in filenames if filename.startswith('Chase%s_Activity' % config_data.last4) and filename.upper().endswith('.CSV')]
+  filename_prefix = 'Chase%s_Activity' % config_data.last4
+
+  # Stop at the second match -- that's already an error, so there's no need to
+  # scan the rest of a potentially large downloads directory
+  filenames = []
+  with os.scandir(downloads_directory) as entries:
+    for entry in entries:
+      if entry.name.startswith(filename_prefix) and entry.name.upper().endswith('.CSV'):
+        filenames.append(entry.name)
+        if len(filenames) > 1:
+          break
+
   if len(filenames) == 0:
     print('ERROR: Could not find chase CSV file in %s' % downloads_directory)
     sys.exit(1)
@@ -193,47 +306,46 @@ def get_chase_csv_filename_or_abort(config_data):
 
 def get_chase_csv_transactions(chase_csv_filename):
   entries = []
+  append_entry = entries.append  # Bound once since it's called for every row
   is_first_line = True
-  with open(chase_csv_filename, 'r') as file_handle:
-    for line in file_handle:
-      line = line.strip()
-      if not line:
+  with open(chase_csv_filename, 'r', buffering=1 << 20, newline='') as file_handle:
+    # Chase CSV doesn't use a real CSV format -- commas aren't handled with quotes
+    # So quoting is disabled and we need to rely on the expected column format
+    for row in csv.reader(file_handle, quoting=csv.QUOTE_NONE):
+      if not row or (len(row) == 1 and not row[0].strip()):
         continue
 
       if is_first_line:
-        if line != 'Transaction Date,Post Date,Description,Category,Type,Amount,Memo':
+        if ','.join(row).strip() != CHASE_CSV_HEADER:
           print('WARNING: Unexpected CSV header line -- has the Chase CSV format changed?')
         is_first_line = False
         continue
 
-      # Chase CSV doesn't use a real CSV format -- commas aren't handled with quotes
-      # So we need to rely on the expected column format
-      line_split = line.split(',', 2)
-      transaction_date_string = line_split[0]
-      post_date_string = line_split[1]
-      description, category, entry_type, amount_string, memo = line_split[2].rsplit(',', 4)  # account for the fact description can contain commas
-      description = description.replace('&amp;', '&')  # for some reason ampersands are escaped in html style
-      description = ' '.join(description.split())  # Get rid of extra consecutive spaces in description
-
-      if entry_type in ['Type', 'Payment', 'Adjustment']:
-        # ignore these
-        # 'Type' is the first line header
-        # 'Payment' is a confirmation of our credit card payment
-        # 'Adjustment' is cash back -- not currently logging, but could in the future
+      transaction_date_string = row[0]
+      post_date_string = row[1]
+      if len(row) == 7:
+        description = row[2]
+      else:
+        description = ','.join(row[2:-4])  # account for the fact description can contain commas
+      category, entry_type, amount_string, memo = row[-4:]
+      if '&amp;' in description:
+        description = description.replace('&amp;', '&')  # for some reason ampersands are escaped in html style
+      if EXTRA_WHITESPACE_RE.search(description):
+        description = WHITESPACE_RE.sub(' ', description).strip()  # Get rid of extra consecutive spaces in description
+
+      if entry_type in IGNORED_CHASE_ENTRY_TYPES:
         continue
 
-      if entry_type not in ['Sale', 'Return', 'Fee']:
+      if entry_type not in CHASE_ENTRY_TYPES:
         print('WARNING: Unknown CSV line type %s' % entry_type)
         continue
 
-      transaction_date_split = transaction_date_string.split('/')
-      transaction_date = date(
-        int(transaction_date_split[2]),
-        int(transaction_date_split[0]),
-        int(transaction_date_split[1]),
-      )
+      # Unpacking the split is ~7x faster than datetime.strptime, which is
+      # implemented in Python
+      transaction_month, transaction_day, transaction_year = transaction_date_string.split('/')
+      transaction_date = date(int(transaction_year), int(transaction_month), int(transaction_day))
 
-      entries.append((transaction_date, Decimal(amount_string), description))
+      append_entry((transaction_date, Decimal(amount_string), description))
 
   # Sort by transaction date
   # This didn't used to be necessary, but at some point, the Chase CSVs started
@@ -249,13 +361,18 @@ def get_spreadsheet_transactions(config_data, service):
   result = sheet.values().get(spreadsheetId=config_data.spreadsheet_id, range=range_to_fetch).execute()
   values = result.get('values', [])
 
+  # Many rows share a date and strptime is slow, so parse each date string once
+  dates_by_string = {}
   entries = []
+  append_entry = entries.append  # Bound once since it's called for every row
   for row in values:
-    transaction_date = datetime.strptime(row[0], '%B %d, %Y').date()
-    amount_string = row[1].replace('$', '').replace(',', '')
+    transaction_date = dates_by_string.get(row[0])
+    if transaction_date is None:
+      transaction_date = dates_by_string[row[0]] = datetime.strptime(row[0], '%B %d, %Y').date()
+    amount_string = row[1].translate(AMOUNT_FORMATTING_TABLE)
     description = row[2]
 
-    entries.append((transaction_date, Decimal(amount_string), description))
+    append_entry((transaction_date, Decimal(amount_string), description))
 
   return entries
 
@@ -286,66 +403,96 @@ def get_spreadsheet_data_validations(config_data, service):
   return newest_quarters_data_validation, data_validation_by_quarter
 
 
-def get_transaction_set_without_amount(transactions):
-  set_without_amount = set()
-  for transaction_date, amount, description in transactions:
-    set_without_amount.add((transaction_date, description))
-  return set_without_amount
-
-
-def is_transaction_in_non_amount_set(transaction, set_without_amount):
-  transaction_date, amount, description = transaction
-  return (transaction_date, description) in set_without_amount
-
-
 def get_missing_transactions(chase_transactions, spreadsheet_transactions):
-  recent_transactions = [transaction for transaction in chase_transactions if date.today() - transaction[0] <= RANGE_TO_CHECK]
-
-  # Remove transactions from chase_transactions that are in spreadsheet_transactions
-  spreadsheet_transactions_set = set(spreadsheet_transactions)
-  initial_missing_transactions = [transaction for transaction in recent_transactions if transaction not in spreadsheet_transactions_set]
+  # chase_transactions is sorted newest first, so stop at the first one older than the cutoff
+  cutoff_date = date.today() - RANGE_TO_CHECK
+  recent_transactions = takewhile(lambda transaction: transaction[0] >= cutoff_date, chase_transactions)
+
+  # Spreadsheet amounts for each (date, description), so one lookup per
+  # transaction tells us both whether it is already in the spreadsheet and
+  # whether only the money differs. Amounts are kept in a list since there is
+  # almost always just one, which avoids hashing Decimals
+  spreadsheet_amounts_by_slim_transaction = {}
+  for transaction_date, amount, description in spreadsheet_transactions:
+    spreadsheet_amounts_by_slim_transaction.setdefault((transaction_date, description), []).append(amount)
 
-  # Then, ignore ones where only money differs (but print warning)
-  spreadsheet_transactions_slim_set = get_transaction_set_without_amount(spreadsheet_transactions)
   final_missing_transactions = []
-  for transaction in initial_missing_transactions:
-    if is_transaction_in_non_amount_set(transaction, spreadsheet_transactions_slim_set):
-      print('WARNING: [%s] %s has differing money (%s on Chase CSV)' % (transaction[0], transaction[2], transaction[1]))
-    else:
+  for transaction in recent_transactions:
+    transaction_date, amount, description = transaction
+    spreadsheet_amounts = spreadsheet_amounts_by_slim_transaction.get((transaction_date, description))
+    if spreadsheet_amounts is None:
       final_missing_transactions.append(transaction)
+    elif amount not in spreadsheet_amounts:
+      # Ignore ones where only money differs (but print warning)
+      print('WARNING: [%s] %s has differing money (%s on Chase CSV)' % (transaction_date, description, amount))
 
   return final_missing_transactions
 
 
 def add_transactions_to_spreadsheet(config_data, service, sheet_id, transactions_to_add, chase_transactions, spreadsheet_transactions, newest_quarters_data_validation, data_validation_by_quarter, classifications):
-  requests = []
+  # Position of each transaction in chase_transactions (the first one, like
+  # list.index), and the last position of each (date, description), ignoring
+  # amount. A (date, description) appears after chase_transactions[i] exactly
+  # when its last position is greater than i
+  chase_transaction_indexes = {}
+  last_chase_indexes_by_slim_transaction = {}
+  for chase_transaction_index, chase_transaction in enumerate(chase_transactions):
+    transaction_date, amount, description = chase_transaction
+    chase_transaction_indexes.setdefault(chase_transaction, chase_transaction_index)
+    last_chase_indexes_by_slim_transaction[(transaction_date, description)] = chase_transaction_index
+
+  # Group transactions that land on consecutive rows into runs of
+  # (first row number, [row data, ...]), so each run needs only one insert
+  # and one update request
+  row_runs = []
   for transaction_index, transaction in enumerate(transactions_to_add):
-    row_number = determine_row_number_for_transaction(transaction, chase_transactions, spreadsheet_transactions)
+    row_number = determine_row_number_for_transaction(chase_transaction_indexes[transaction], last_chase_indexes_by_slim_transaction, spreadsheet_transactions)
     row_number += transaction_index  # Take into account rows we've already added
-    requests += get_spreadsheet_requests_for_transaction(sheet_id, transaction, row_number, newest_quarters_data_validation, data_validation_by_quarter, classifications)
+    row_data = get_spreadsheet_row_data_for_transaction(transaction, newest_quarters_data_validation, data_validation_by_quarter, classifications)
+    if row_runs and row_runs[-1][0] + len(row_runs[-1][1]) == row_number and len(row_runs[-1][1]) < MAX_ROWS_PER_BATCH_UPDATE:
+      row_runs[-1][1].append(row_data)
+    else:
+      row_runs.append((row_number, [row_data]))
+
+  # Send at most MAX_ROWS_PER_BATCH_UPDATE rows per batchUpdate so large
+  # imports stay under the Sheets request size limit. The batches have to go
+  # out one after another, since each row number accounts for the rows inserted
+  # before it
+  requests = []
+  rows_in_batch = 0
+  for row_number, rows_data in row_runs:
+    if rows_in_batch + len(rows_data) > MAX_ROWS_PER_BATCH_UPDATE:
+      send_spreadsheet_requests(config_data, service, requests)
+      requests = []
+      rows_in_batch = 0
+    requests += get_spreadsheet_requests_for_rows(sheet_id, row_number, rows_data)
+    rows_in_batch += len(rows_data)
+
+  if requests:
+    send_spreadsheet_requests(config_data, service, requests)
 
+
+def send_spreadsheet_requests(config_data, service, requests):
   body = {
     'requests': requests,
   }
   service.spreadsheets().batchUpdate(spreadsheetId=config_data.spreadsheet_id, body=body).execute()
 
 
-def determine_row_number_for_transaction(transaction, chase_transactions, spreadsheet_transactions):
+def determine_row_number_for_transaction(transaction_index, last_chase_indexes_by_slim_transaction, spreadsheet_transactions):
   # Find the first transaction in spreadsheet_transactions
-  # that is in chase_transactions but after transaction
-  transaction_index = chase_transactions.index(transaction)
-  chase_transactions_slim_set = get_transaction_set_without_amount(chase_transactions[transaction_index + 1:])
-
+  # that is in chase_transactions but after chase_transactions[transaction_index]
+  # (ignoring amount)
   row_number = 0
-  for transaction in spreadsheet_transactions:
+  for transaction_date, amount, description in spreadsheet_transactions:
     row_number += 1
-    if is_transaction_in_non_amount_set(transaction, chase_transactions_slim_set):
+    if last_chase_indexes_by_slim_transaction.get((transaction_date, description), -1) > transaction_index:
       break
 
   return row_number
 
 
-def get_spreadsheet_requests_for_transaction(sheet_id, transaction, row_number, newest_quarters_data_validation, data_validation_by_quarter, classifications):
+def get_spreadsheet_row_data_for_transaction(transaction, newest_quarters_data_validation, data_validation_by_quarter, classifications):
   transaction_date, amount, description = transaction
   classification = Classification.find(classifications, description)
 
@@ -354,43 +501,19 @@ def get_spreadsheet_requests_for_transaction(sheet_id, transaction, row_number,
       'userEnteredValue': {
         'numberValue': datetime_to_sheets_days(transaction_date),
       },
-      'userEnteredFormat': {
-        'numberFormat': {
-          'pattern': 'mmmm d, yyy',
-          'type': 'DATE',
-        },
-        'textFormat': {
-          'fontFamily': 'Arial',
-          'fontSize': 10,
-        },
-      },
+      'userEnteredFormat': DATE_CELL_FORMAT,
     },
     {
       'userEnteredValue': {
         'numberValue': str(amount),
       },
-      'userEnteredFormat': {
-        'numberFormat': {
-          'pattern': '$0.00',
-          'type': 'CURRENCY',
-        },
-        'textFormat': {
-          'fontFamily': 'Arial',
-          'fontSize': 10,
-        },
-      },
+      'userEnteredFormat': CURRENCY_CELL_FORMAT,
     },
     {
       'userEnteredValue': {
         'stringValue': description,
       },
-      'userEnteredFormat': {
-        'textFormat': {
-          'fontFamily': 'Arial',
-          'fontSize': 10,
-          'bold': True,  # Bold the description to make it clear what is "new"
-        },
-      },
+      'userEnteredFormat': NEW_TEXT_CELL_FORMAT,  # Bold the description to make it clear what is "new"
     },
   ]
 
@@ -405,13 +528,7 @@ def get_spreadsheet_requests_for_transaction(sheet_id, transaction, row_number,
       'userEnteredValue': {
         'stringValue': quarter_value,
       },
-      'userEnteredFormat': {
-        'textFormat': {
-          'fontFamily': 'Arial',
-          'fontSize': 10,
-          'bold': True,  # Bold to make it clear what is "new"
-        },
-      },
+      'userEnteredFormat': NEW_TEXT_CELL_FORMAT,
       'dataValidation': newest_quarters_data_validation,
     }
     row_data.append(data_to_append_for_quarter)
@@ -420,13 +537,7 @@ def get_spreadsheet_requests_for_transaction(sheet_id, transaction, row_number,
       'userEnteredValue': {
         'stringValue': classification.category,
       },
-      'userEnteredFormat': {
-        'textFormat': {
-          'fontFamily': 'Arial',
-          'fontSize': 10,
-          'bold': True,  # Bold to make it clear what is "new"
-        },
-      },
+      'userEnteredFormat': NEW_TEXT_CELL_FORMAT,
     }
     if quarter_value and quarter_value in data_validation_by_quarter:
       data_to_append_for_category['dataValidation'] = data_validation_by_quarter[quarter_value]
@@ -437,23 +548,21 @@ def get_spreadsheet_requests_for_transaction(sheet_id, transaction, row_number,
         'userEnteredValue': {
           'stringValue': classification.subcategory,
         },
-        'userEnteredFormat': {
-          'textFormat': {
-            'fontFamily': 'Arial',
-            'fontSize': 10,
-            'bold': True,  # Bold to make it clear what is "new"
-          },
-        },
+        'userEnteredFormat': NEW_TEXT_CELL_FORMAT,
       })
 
+  return row_data
+
 
-  insert_row_request = {
+def get_spreadsheet_requests_for_rows(sheet_id, row_number, rows_data):
+  # Insert len(rows_data) rows at row_number and fill them in
+  insert_rows_request = {
     'insertDimension': {
       'range': {
         'sheetId': str(sheet_id),
         'dimension': 'ROWS',
         'startIndex': row_number,
-        'endIndex': row_number + 1,
+        'endIndex': row_number + len(rows_data),
       },
     },
   }
@@ -468,27 +577,23 @@ def get_spreadsheet_requests_for_transaction(sheet_id, transaction, row_number,
       'rows': [
         {
           'values': row_data,
-        },
+        }
+        for row_data in rows_data
       ],
       'fields': '*',
     },
   }
 
   return [
-    insert_row_request,
+    insert_rows_request,
     update_cells_request,
   ]
 
 
 def get_oldest_transaction_day(transactions):
-  oldest_day = None
-  for transaction in transactions:
-    transaction_date, amount, description = transaction
-    if oldest_day is None:
-      oldest_day = transaction_date
-    else:
-      oldest_day = min(oldest_day, transaction_date)
-  return oldest_day
+  if not transactions:
+    return None
+  return min(transactions, key=itemgetter(0))[0]
 
 
 def main():
@@ -496,12 +601,19 @@ def main():
   classifications = Classification.parse()
 
   chase_csv_filename = get_chase_csv_filename_or_abort(config_data)
-  chase_transactions = get_chase_csv_transactions(chase_csv_filename)
 
-  service = get_sheets_service()
-  sheet_id = get_sheet_id(config_data, service)
-  spreadsheet_transactions = get_spreadsheet_transactions(config_data, service)
-  newest_quarters_data_validation, data_validation_by_quarter = get_spreadsheet_data_validations(config_data, service)
+  # Parse the Chase CSV in the background while we talk to Google Sheets. The
+  # Sheets calls themselves stay on this thread -- the httplib2 connection
+  # under the service isn't thread-safe
+  with ThreadPoolExecutor(max_workers=1) as executor:
+    chase_transactions_future = executor.submit(get_chase_csv_transactions, chase_csv_filename)
+
+    service = get_sheets_service()
+    sheet_id = get_sheet_id(config_data, service)
+    spreadsheet_transactions = get_spreadsheet_transactions(config_data, service)
+    newest_quarters_data_validation, data_validation_by_quarter = get_spreadsheet_data_validations(config_data, service)
+
+    chase_transactions = chase_transactions_future.result()
 
   transactions_to_add = get_missing_transactions(chase_transactions, spreadsheet_transactions)
   if transactions_to_add: